@@ -0,0 +1,346 @@
+import os
+import abc
+import shutil
+import fnmatch
+import hashlib
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+# Backup: то, что не копируется в резервную копию
+BACKUP_IGNORE_PATTERNS = (
+    '.idea', '__pycache__', '.git', '.venv', 'venv', 'env', 'node_modules',
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp', '*.svg', '*.ico', '*.webp'
+)
+
+# S3 multipart upload
+S3_MIN_CHUNK_SIZE = 5 * 1024 * 1024    # меньше S3 не принимает (EntityTooSmall)
+S3_CHUNK_SIZE = 8 * 1024 * 1024
+S3_MAX_PARTS = 10000
+S3_MAX_WORKERS = 8
+S3_MTIME_KEY = "local-mtime-ns"        # метаданные объекта: mtime исходного файла
+S3_DELETE_BATCH = 1000                 # максимум ключей в одном DeleteObjects
+
+
+def collect_backup_files(project_path):
+    """Return (absolute path, relative path) of every file that goes into a backup"""
+    files = []
+    for root, dirs, filenames in os.walk(project_path):
+        dirs[:] = sorted(d for d in dirs
+                         if not any(fnmatch.fnmatch(d, p) for p in BACKUP_IGNORE_PATTERNS))
+        for name in sorted(filenames):
+            if any(fnmatch.fnmatch(name, p) for p in BACKUP_IGNORE_PATTERNS):
+                continue
+            path = os.path.join(root, name)
+            files.append((path, os.path.relpath(path, project_path)))
+    return files
+
+
+class BackupBackend(abc.ABC):
+    """Destination of a project backup.
+
+    backup() is called from a worker thread; progress, if given, is called
+    with (done, total) in backend-specific units.
+    """
+
+    @abc.abstractmethod
+    def describe(self):
+        """Human-readable location of the backup"""
+
+    @abc.abstractmethod
+    def backup(self, project_path, progress=None):
+        """Back up project_path, raising on failure"""
+
+
+class LocalDirBackend(BackupBackend):
+    """Plain copy of the project into a local directory (replaced on each run)"""
+
+    def __init__(self, backup_dir):
+        self.backup_dir = backup_dir
+
+    def describe(self):
+        return self.backup_dir
+
+    def backup(self, project_path, progress=None):
+        if os.path.exists(self.backup_dir):
+            shutil.rmtree(self.backup_dir)
+        shutil.copytree(project_path, self.backup_dir,
+                        ignore=shutil.ignore_patterns(*BACKUP_IGNORE_PATTERNS))
+
+
+class ArchiveBackend(BackupBackend):
+    """Zip archive of the project"""
+
+    def __init__(self, archive_path):
+        self.archive_path = archive_path
+
+    def describe(self):
+        return self.archive_path
+
+    def backup(self, project_path, progress=None):
+        files = collect_backup_files(project_path)
+        tmp_path = self.archive_path + ".part"
+        # Пишем во временный файл, чтобы прерванный бэкап не испортил предыдущий архив
+        try:
+            with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+                for done, (path, rel) in enumerate(files, 1):
+                    zf.write(path, rel)
+                    if progress:
+                        progress(done, len(files))
+            os.replace(tmp_path, self.archive_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class S3Backend(BackupBackend):
+    """S3-compatible object storage (AWS, MinIO, moto_server, ...).
+
+    Files up to chunk_size are sent with a single PUT, larger ones as
+    multipart uploads. Checking files and uploading parts share one bounded
+    thread pool and one pooled client. Unchanged files are skipped: large
+    ones by the mtime stored in the object metadata, small ones (and objects
+    without that metadata) by ETag. The newest unfinished multipart upload of
+    a file is resumed by re-sending only the parts that are missing or
+    different; all other unfinished uploads under the project are aborted.
+
+    Like the local and archive backends, the stored copy mirrors the project:
+    objects whose files were deleted locally are removed, unless
+    delete_removed is False.
+
+    Credentials come from boto3's default chain (environment variables,
+    ~/.aws/credentials, instance roles) or from the given named profile;
+    they are never stored in the application settings.
+    """
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, region=None, profile=None,
+                 chunk_size=S3_CHUNK_SIZE, max_workers=S3_MAX_WORKERS, delete_removed=True):
+        # boto3 нужен только для этого бэкенда
+        import boto3
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.endpoint_url = endpoint_url
+        self.chunk_size = max(int(chunk_size), S3_MIN_CHUNK_SIZE)
+        self.max_workers = max(int(max_workers), 1)
+        self.delete_removed = delete_removed
+        session = boto3.Session(profile_name=profile or None)
+        self.client = session.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            config=Config(max_pool_connections=self.max_workers,
+                          retries={"max_attempts": 5, "mode": "standard"}),
+        )
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Create the backend from the "s3" section of backup_settings.json"""
+        chunk_size_mb = float(settings.get("chunk_size_mb", S3_CHUNK_SIZE / (1024 * 1024)))
+        return cls(
+            bucket=settings["bucket"],
+            prefix=settings.get("prefix", ""),
+            endpoint_url=settings.get("endpoint_url"),
+            region=settings.get("region"),
+            profile=settings.get("profile"),
+            chunk_size=int(chunk_size_mb * 1024 * 1024),
+            max_workers=int(settings.get("max_workers", S3_MAX_WORKERS)),
+            delete_removed=bool(settings.get("delete_removed", True)),
+        )
+
+    def describe(self):
+        location = f"s3://{self.bucket}/{self.prefix}"
+        return f"{location} ({self.endpoint_url})" if self.endpoint_url else location
+
+    def object_key(self, project_path, rel_path):
+        parts = [self.prefix, os.path.basename(os.path.normpath(project_path)),
+                 rel_path.replace(os.sep, "/")]
+        return "/".join(p for p in parts if p)
+
+    def part_size(self, file_size):
+        """Chunk size for a file, enlarged so that it fits in S3_MAX_PARTS parts"""
+        size = self.chunk_size
+        while file_size > size * S3_MAX_PARTS:
+            size *= 2
+        return size
+
+    def read_chunk(self, path, offset, size):
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            return f.read(size)
+
+    def local_etag(self, path, file_size):
+        """ETag S3 would report for this file uploaded by this backend"""
+        if file_size <= self.chunk_size:
+            digest = hashlib.md5()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            return digest.hexdigest()
+
+        part_size = self.part_size(file_size)
+        digests = []
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(part_size), b""):
+                digests.append(hashlib.md5(block).digest())
+        return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+    def is_unchanged(self, key, path, stat, remote_entry):
+        """Check whether the stored object already holds this file"""
+        remote_size, remote_etag = remote_entry
+        if remote_size != stat.st_size:
+            return False
+        if stat.st_size > self.chunk_size:
+            # Большой файл не перечитываем, если известен его mtime
+            metadata = self.client.head_object(Bucket=self.bucket, Key=key).get("Metadata", {})
+            if S3_MTIME_KEY in metadata:
+                return metadata[S3_MTIME_KEY] == str(stat.st_mtime_ns)
+        return remote_etag == self.local_etag(path, stat.st_size)
+
+    def list_remote(self, prefix):
+        """Return {key: (size, etag)} for objects under prefix"""
+        remote = {}
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                remote[obj["Key"]] = (obj["Size"], obj["ETag"].strip('"'))
+        return remote
+
+    def list_pending_uploads(self, prefix):
+        """Return {key: [upload_id, ...]} of unfinished multipart uploads, newest first"""
+        uploads = {}
+        paginator = self.client.get_paginator("list_multipart_uploads")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for upload in page.get("Uploads", []):
+                uploads.setdefault(upload["Key"], []).append(upload)
+        return {key: [u["UploadId"] for u in sorted(items, key=lambda u: u["Initiated"], reverse=True)]
+                for key, items in uploads.items()}
+
+    def abort_uploads(self, key, upload_ids):
+        for upload_id in upload_ids:
+            try:
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            except self.client.exceptions.NoSuchUpload:
+                pass
+
+    def delete_objects(self, keys):
+        """Delete keys in batches of S3_DELETE_BATCH"""
+        keys = sorted(keys)
+        for i in range(0, len(keys), S3_DELETE_BATCH):
+            batch = [{"Key": key} for key in keys[i:i + S3_DELETE_BATCH]]
+            response = self.client.delete_objects(
+                Bucket=self.bucket, Delete={"Objects": batch, "Quiet": True})
+            errors = response.get("Errors", [])
+            if errors:
+                raise RuntimeError(f"Failed to delete {len(errors)} object(s), "
+                                   f"first: {errors[0]['Key']}: {errors[0].get('Message')}")
+
+    def uploaded_parts(self, key, upload_id):
+        """Return {part_number: etag} of the parts already stored for an upload"""
+        parts = {}
+        paginator = self.client.get_paginator("list_parts")
+        for page in paginator.paginate(Bucket=self.bucket, Key=key, UploadId=upload_id):
+            for part in page.get("Parts", []):
+                parts[part["PartNumber"]] = part["ETag"].strip('"')
+        return parts
+
+    def backup(self, project_path, progress=None):
+        files = collect_backup_files(project_path)
+        project_prefix = self.object_key(project_path, "") + "/"
+        remote = self.list_remote(project_prefix)
+        pending = self.list_pending_uploads(project_prefix)
+
+        # Незавершённые загрузки файлов, которых больше нет, только занимают место
+        keys = {self.object_key(project_path, rel) for _, rel in files}
+        for key in set(pending) - keys:
+            self.abort_uploads(key, pending[key])
+        if self.delete_removed:
+            self.delete_objects(set(remote) - keys)
+
+        total = sum(os.path.getsize(path) for path, _ in files)
+        done = 0
+        lock = threading.Lock()
+
+        def advance(nbytes):
+            nonlocal done
+            with lock:
+                done += nbytes
+                if progress:
+                    progress(done, total)
+
+        def upload_part(path, key, upload_id, number, offset, size, stored_etag):
+            data = self.read_chunk(path, offset, size)
+            etag = hashlib.md5(data).hexdigest()
+            # Часть уже загружена прерванной попыткой
+            if stored_etag != etag:
+                etag = self.client.upload_part(Bucket=self.bucket, Key=key, UploadId=upload_id,
+                                               PartNumber=number, Body=data)["ETag"].strip('"')
+            advance(len(data))
+            return number, etag
+
+        def sync_file(pool, path, key):
+            """Upload one file; for multipart uploads returns (key, upload_id, part futures)"""
+            stat = os.stat(path)
+            stale = pending.get(key, [])
+            if key in remote and self.is_unchanged(key, path, stat, remote[key]):
+                self.abort_uploads(key, stale)
+                advance(stat.st_size)
+                return None
+
+            metadata = {S3_MTIME_KEY: str(stat.st_mtime_ns)}
+            if stat.st_size <= self.chunk_size:
+                self.abort_uploads(key, stale)
+                with open(path, 'rb') as f:
+                    self.client.put_object(Bucket=self.bucket, Key=key, Body=f, Metadata=metadata)
+                advance(stat.st_size)
+                return None
+
+            # Продолжаем самую свежую загрузку, остальные отменяем
+            self.abort_uploads(key, stale[1:])
+            upload_id = stale[0] if stale else None
+            stored = self.uploaded_parts(key, upload_id) if upload_id else {}
+            if not upload_id:
+                upload_id = self.client.create_multipart_upload(
+                    Bucket=self.bucket, Key=key, Metadata=metadata)["UploadId"]
+            part_size = self.part_size(stat.st_size)
+            part_futures = [
+                pool.submit(upload_part, path, key, upload_id, number, offset,
+                            min(part_size, stat.st_size - offset), stored.get(number))
+                for number, offset in enumerate(range(0, stat.st_size, part_size), 1)
+            ]
+            return key, upload_id, part_futures
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            file_futures = [pool.submit(sync_file, pool, path, self.object_key(project_path, rel))
+                            for path, rel in files]
+            multipart = []
+            for future in as_completed(file_futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                if result:
+                    multipart.append(result)
+
+            for key, upload_id, part_futures in multipart:
+                part_errors = [f.exception() for f in part_futures if f.exception()]
+                if part_errors:
+                    errors.extend(part_errors)
+                    continue  # Незавершённая загрузка будет продолжена при следующем бэкапе
+                parts = sorted(f.result() for f in part_futures)
+                try:
+                    self.client.complete_multipart_upload(
+                        Bucket=self.bucket, Key=key, UploadId=upload_id,
+                        MultipartUpload={"Parts": [{"PartNumber": n, "ETag": f'"{e}"'}
+                                                   for n, e in parts]},
+                    )
+                except Exception as e:
+                    errors.append(e)
+
+        if errors:
+            raise RuntimeError(f"{len(errors)} upload(s) failed, first error: {errors[0]}")
@@ -0,0 +1,115 @@
+import os
+import mmap
+import codecs
+
+
+# Canvas ingestion limits
+CANVAS_SNIFF_BYTES = 8192              # сколько байт читаем для определения типа файла
+CANVAS_MAX_FILE_BYTES = 256 * 1024     # файлы больше этого размера попадают в canvas урезанными
+CANVAS_EXCERPT_BYTES = 32 * 1024       # размер начала и конца большого файла
+
+# Language tag for the markdown fence, by file extension
+FENCE_LANGUAGES = {
+    '.py': 'python', '.js': 'javascript', '.ts': 'typescript', '.html': 'html',
+    '.css': 'css', '.json': 'json', '.md': 'markdown', '.yaml': 'yaml', '.yml': 'yaml',
+    '.txt': 'text', '.toml': 'toml', '.ini': 'ini', '.cfg': 'ini', '.sh': 'bash',
+    '.sql': 'sql', '.xml': 'xml', '.lock': 'text',
+}
+
+
+def fence_language(file_path):
+    """Return the markdown fence language for a file, based on its extension"""
+    ext = os.path.splitext(file_path)[1].lower()
+    return FENCE_LANGUAGES.get(ext, 'text')
+
+
+def detect_encoding(sample):
+    """Guess the text encoding of a byte sample, or return None for binary data"""
+    # BOM однозначно определяет кодировку
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    # Явный порядок байт: у хвоста большого файла BOM нет
+    if sample.startswith(codecs.BOM_UTF16_LE):
+        return 'utf-16-le'
+    if sample.startswith(codecs.BOM_UTF16_BE):
+        return 'utf-16-be'
+
+    # UTF-16 без BOM: у латиницы каждый второй байт нулевой, а остальные - нет
+    half = len(sample) // 2
+    if half:
+        even_nuls = sample[0::2].count(0)
+        odd_nuls = sample[1::2].count(0)
+        if odd_nuls > half * 0.3 and even_nuls < half * 0.02:
+            return 'utf-16-le'
+        if even_nuls > half * 0.3 and odd_nuls < half * 0.02:
+            return 'utf-16-be'
+
+    # Остальные NUL-байты почти всегда означают бинарный файл
+    if b'\x00' in sample:
+        return None
+
+    # Много управляющих символов - тоже бинарный файл
+    control = sum(1 for b in sample if b < 32 and b not in (9, 10, 12, 13, 27))
+    if sample and control / len(sample) > 0.1:
+        return None
+
+    try:
+        # final=False: последний многобайтовый символ может быть обрезан на границе выборки
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp1251'
+
+
+def decode_excerpt(data, encoding, keep_start):
+    """Decode a slice of a large file, trimming the partial line at the cut"""
+    if not encoding.startswith('utf-16'):
+        if keep_start:
+            cut = data.rfind(b'\n')
+            data = data[:cut] if cut > 0 else data
+        else:
+            cut = data.find(b'\n')
+            data = data[cut + 1:] if cut >= 0 else data
+    elif len(data) % 2:
+        data = data[:-1]
+    return strip_bom(data.decode(encoding, errors='replace'))
+
+
+def strip_bom(text):
+    # utf-16-le/be, в отличие от utf-16 и utf-8-sig, не удаляют BOM при декодировании
+    return text[1:] if text.startswith('\ufeff') else text
+
+
+def read_file_for_canvas(file_path):
+    """Read a file for the canvas, returning (fence_language, text).
+
+    Binary files are replaced with a note, files above CANVAS_MAX_FILE_BYTES
+    are reduced to a head/tail excerpt read through mmap.
+    """
+    language = fence_language(file_path)
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return language, ""
+
+    with open(file_path, 'rb') as f:
+        if size <= CANVAS_MAX_FILE_BYTES:
+            data = f.read()
+            encoding = detect_encoding(data[:CANVAS_SNIFF_BYTES])
+            if encoding is None:
+                return "text", f"# BINARY FILE SKIPPED ({size} bytes)"
+            return language, strip_bom(data.decode(encoding, errors='replace'))
+
+        # Большой файл: читаем только начало и конец, не загружая его целиком
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            encoding = detect_encoding(mm[:CANVAS_SNIFF_BYTES])
+            if encoding is None:
+                return "text", f"# BINARY FILE SKIPPED ({size} bytes)"
+            tail_start = size - CANVAS_EXCERPT_BYTES
+            if encoding.startswith('utf-16'):
+                tail_start += tail_start % 2  # хвост должен начинаться на границе символа
+            head = decode_excerpt(mm[:CANVAS_EXCERPT_BYTES], encoding, True)
+            tail = decode_excerpt(mm[tail_start:], encoding, False)
+
+    omitted = size - 2 * CANVAS_EXCERPT_BYTES
+    marker = f"\n\n... [TRUNCATED: about {omitted} of {size} bytes omitted] ...\n\n"
+    return language, head + marker + tail
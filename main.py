@@ -5,10 +5,332 @@ from pathlib import Path
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QComboBox, QTreeWidget, QTreeWidgetItem, QPushButton, QLabel,
-    QFileDialog, QMessageBox, QCheckBox, QListWidget, QAbstractItemView, QMenu
+    QFileDialog, QMessageBox, QCheckBox, QListWidget, QAbstractItemView, QMenu,
+    QSystemTrayIcon, QStyle
+)
+from PyQt5.QtCore import (
+    Qt, QObject, QTimer, QThread, QFileSystemWatcher, QCoreApplication, pyqtSignal
 )
-from PyQt5.QtCore import Qt
 import sys
+import time
+import signal
+import argparse
+
+from backup_backends import LocalDirBackend, ArchiveBackend, S3Backend
+from canvas_ingest import read_file_for_canvas
+
+
+class BackupWorker(QThread):
+    """Runs a backup backend outside the GUI thread"""
+
+    progress = pyqtSignal("qint64", "qint64")
+    succeeded = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, backend, project_path, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+        self.project_path = project_path
+
+    def run(self):
+        try:
+            self.backend.backup(self.project_path, self.progress.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(self.backend.describe())
+
+
+# Не сохраняются в backup_settings.json - см. S3Backend
+S3_SECRET_SETTINGS = ("access_key", "secret_key", "session_token")
+
+# Watch mode: пауза после последнего события перед синхронизацией
+WATCH_DEBOUNCE_MS = 2000
+# ...но при непрерывных изменениях синхронизируем не реже, чем раз в N пауз
+WATCH_MAX_WAIT_FACTOR = 5
+# Повторы после ошибок: пауза удваивается, после N попыток ждём нового события
+WATCH_MAX_RETRIES = 5
+
+
+class ProjectWatcher(QObject):
+    """Keeps a backup directory in sync with a project using filesystem events.
+
+    Included directories and files are registered with QFileSystemWatcher.
+    Events are collected for WATCH_DEBOUNCE_MS (at most WATCH_MAX_WAIT_FACTOR
+    times that during a steady stream of events), then only the affected
+    directories are compared with the backup and changed files are copied.
+
+    The backup directory may also hold files copied by "Create Backup";
+    only entries the watcher mirrors itself (``managed``) are removed when
+    they become excluded, others only when their source is deleted.
+    Directories that failed to sync are retried with exponential backoff,
+    up to WATCH_MAX_RETRIES times, then only on their next change event.
+    """
+
+    synced = pyqtSignal(str, int)  # project path, number of applied changes
+
+    def __init__(self, project_path, backup_dir, debounce_ms=WATCH_DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.project_path = os.path.abspath(project_path)
+        self.backup_dir = os.path.abspath(backup_dir)
+        self.exclude_file = os.path.join(self.project_path, "excluded_items.json")
+        self.excluded_items = set()
+        self.exclude_mtime = None
+        self.watched = set()
+        self.pending_dirs = set()
+        self.failed_dirs = set()
+        self.retry_attempts = {}
+        self.managed = set()
+        self.reload_exclusions = False
+        self.watch_limit_reported = False
+
+        self.debounce_ms = debounce_ms
+        self.max_wait = debounce_ms * WATCH_MAX_WAIT_FACTOR / 1000
+        self.burst_started = None
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.timeout.connect(self.flush)
+
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self.retry_now)
+
+    def start(self):
+        """Bring the backup up to date and start watching the project"""
+        self.excluded_items = self.load_excluded_items()
+        self.failed_dirs.clear()
+        count = self.sync_directory(self.project_path, recursive=True)
+        self.synced.emit(self.project_path, count)
+        # Полный проход заново проверил все каталоги
+        for dir_path in list(self.retry_attempts):
+            if dir_path not in self.failed_dirs:
+                del self.retry_attempts[dir_path]
+        self.retry_failed()
+        return count
+
+    def stop(self):
+        """Stop watching; pending changes are dropped"""
+        self.debounce_timer.stop()
+        self.retry_timer.stop()
+        self.burst_started = None
+        self.pending_dirs.clear()
+        if self.watched:
+            self.watcher.removePaths(list(self.watched))
+        self.watched.clear()
+
+    def file_mtime(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def load_excluded_items(self):
+        """Загружает excluded_items.json проекта"""
+        self.exclude_mtime = self.file_mtime(self.exclude_file)
+        if self.exclude_mtime is None:
+            return set()
+        try:
+            with open(self.exclude_file, 'r', encoding='utf-8') as f:
+                return set(json.load(f))
+        except (OSError, ValueError):
+            return self.excluded_items  # Файл может быть записан не полностью - оставляем прежний список
+
+    def is_included(self, entry):
+        """Apply the same rules as the project tree: should_include and excluded items"""
+        rel_path = os.path.relpath(entry.path, self.project_path)
+        return ProjectBackupApp.should_include(entry) and rel_path not in self.excluded_items
+
+    def backup_path(self, src_path):
+        return os.path.join(self.backup_dir, os.path.relpath(src_path, self.project_path))
+
+    def watch(self, path):
+        if path in self.watched:
+            return
+        if self.watcher.addPath(path):
+            self.watched.add(path)
+        elif not self.watch_limit_reported:
+            # Обычно это лимит inotify (fs.inotify.max_user_watches) или kqueue
+            self.watch_limit_reported = True
+            print(f"Watch mode: cannot watch {path}, changes to some files will only be "
+                  f"picked up when their directory changes (watch limit reached?)", file=sys.stderr)
+
+    def forget(self, path):
+        """Drop the watches of a path and everything below it"""
+        prefix = path + os.sep
+        gone = [p for p in self.watched if p == path or p.startswith(prefix)]
+        if gone:
+            self.watcher.removePaths(gone)
+            self.watched.difference_update(gone)
+
+    def schedule(self):
+        """Restart the debounce timer, but never past the burst's max wait"""
+        now = time.monotonic()
+        if self.burst_started is None:
+            self.burst_started = now
+        remaining = self.max_wait - (now - self.burst_started)
+        self.debounce_timer.start(max(0, min(self.debounce_ms, int(remaining * 1000))))
+
+    def on_directory_changed(self, path):
+        # excluded_items.json мог появиться или исчезнуть - fileChanged для него не придёт
+        if path == self.project_path and self.file_mtime(self.exclude_file) != self.exclude_mtime:
+            self.reload_exclusions = True
+        self.retry_attempts.pop(path, None)
+        self.pending_dirs.add(path)
+        self.schedule()
+
+    def on_file_changed(self, path):
+        # Редакторы часто сохраняют файл через замену - Qt при этом теряет наблюдение,
+        # поэтому забываем путь и заново добавляем его при синхронизации каталога
+        self.forget(path)
+        if path == self.exclude_file:
+            self.reload_exclusions = True
+        self.retry_attempts.pop(os.path.dirname(path), None)
+        self.pending_dirs.add(os.path.dirname(path))
+        self.schedule()
+
+    def flush(self):
+        """Apply the changes collected during the debounce window"""
+        self.burst_started = None
+        if self.reload_exclusions:
+            # Список исключений изменился - пересобираем наблюдение целиком
+            self.reload_exclusions = False
+            self.stop()
+            try:
+                self.start()
+            except Exception as e:
+                # Повторим при следующем событии
+                print(f"Watch mode: failed to rescan {self.project_path}: {e}", file=sys.stderr)
+                self.reload_exclusions = True
+            return
+
+        pending, self.pending_dirs = self.pending_dirs, set()
+        count = 0
+        for dir_path in sorted(pending):
+            try:
+                count += self.sync_directory(dir_path, recursive=False)
+            except Exception as e:
+                self.sync_failed(dir_path, dir_path, e)
+            if dir_path not in self.failed_dirs:
+                self.retry_attempts.pop(dir_path, None)
+        if count:
+            self.synced.emit(self.project_path, count)
+        self.retry_failed()
+
+    def retry_failed(self):
+        """Schedule a retry of the directories that failed, with exponential backoff"""
+        failed, self.failed_dirs = self.failed_dirs, set()
+        for dir_path in failed:
+            attempts = self.retry_attempts.get(dir_path, 0) + 1
+            self.retry_attempts[dir_path] = attempts
+            if attempts > WATCH_MAX_RETRIES:
+                print(f"Watch mode: giving up on {dir_path} until it changes again", file=sys.stderr)
+
+        waiting = [a for d, a in self.retry_attempts.items() if d in failed and a <= WATCH_MAX_RETRIES]
+        if waiting:
+            self.retry_timer.start(self.debounce_ms * 2 ** (min(waiting) - 1))
+
+    def retry_now(self):
+        self.pending_dirs |= {d for d, a in self.retry_attempts.items() if a <= WATCH_MAX_RETRIES}
+        self.flush()
+
+    def sync_directory(self, src_dir, recursive):
+        """Copy changed files of src_dir to the backup and mirror deletions.
+
+        Existing subdirectories are only descended into when recursive is set;
+        otherwise their own watches report their changes. Entries that fail
+        are skipped and src_dir is remembered in failed_dirs.
+        """
+        dst_dir = self.backup_path(src_dir)
+        if not os.path.isdir(src_dir):
+            self.forget(src_dir)
+            if os.path.isdir(dst_dir):
+                self.remove_backup_entry(src_dir, dst_dir)
+                return 1
+            return 0
+
+        try:
+            os.makedirs(dst_dir, exist_ok=True)
+            entries = list(os.scandir(src_dir))
+        except PermissionError:
+            return 0  # Skip entries we don't have permission to access
+        except OSError as e:
+            self.sync_failed(src_dir, src_dir, e)
+            return 0
+        self.watch(src_dir)
+
+        count = 0
+        included = set()
+        for entry in entries:
+            try:
+                if not self.is_included(entry):
+                    continue
+                included.add(entry.name)
+                self.managed.add(entry.path)
+                dst_path = os.path.join(dst_dir, entry.name)
+                if entry.is_dir():
+                    if recursive or not os.path.isdir(dst_path):
+                        count += self.sync_directory(entry.path, recursive=True)
+                    continue
+
+                self.watch(entry.path)
+                src_stat = entry.stat()
+                try:
+                    dst_stat = os.stat(dst_path)
+                    unchanged = (dst_stat.st_size == src_stat.st_size and
+                                 dst_stat.st_mtime_ns == src_stat.st_mtime_ns)
+                except FileNotFoundError:
+                    unchanged = False
+                if not unchanged:
+                    shutil.copy2(entry.path, dst_path)
+                    count += 1
+            except FileNotFoundError:
+                # Файл удалён во время синхронизации - придёт новое событие каталога
+                included.discard(entry.name)
+            except OSError as e:
+                self.sync_failed(src_dir, entry.path, e)
+
+        # Удаляем из бэкапа то, чего больше нет в проекте, и исключённое из того,
+        # что копировал сам watcher; остальное могло попасть туда через "Create Backup"
+        try:
+            backup_names = os.listdir(dst_dir)
+        except OSError as e:
+            self.sync_failed(src_dir, dst_dir, e)
+            return count
+        for name in backup_names:
+            src_path = os.path.join(src_dir, name)
+            if name in included or (os.path.lexists(src_path) and src_path not in self.managed):
+                continue
+            if self.remove_backup_entry(src_path, os.path.join(dst_dir, name)):
+                count += 1
+
+        return count
+
+    def remove_backup_entry(self, src_path, dst_path):
+        self.forget(src_path)
+        prefix = src_path + os.sep
+        self.managed = {p for p in self.managed if p != src_path and not p.startswith(prefix)}
+        try:
+            if os.path.isdir(dst_path) and not os.path.islink(dst_path):
+                shutil.rmtree(dst_path)
+            else:
+                os.remove(dst_path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            self.sync_failed(os.path.dirname(src_path), dst_path, e)
+            return False
+        return True
+
+    def sync_failed(self, dir_path, path, error):
+        # Об ошибке сообщаем один раз, а не при каждом повторе
+        if dir_path not in self.retry_attempts and dir_path not in self.failed_dirs:
+            print(f"Watch mode: failed to sync {path}: {error}", file=sys.stderr)
+        self.failed_dirs.add(dir_path)
 
 
 class ProjectBackupApp(QMainWindow):
@@ -64,7 +386,15 @@ class ProjectBackupApp(QMainWindow):
         # Подключите сигнал
         self.toggle_excluded_button.clicked.connect(self.toggle_excluded_visibility)
 
+        self.backup_target_combo = QComboBox()
+        self.backup_target_combo.addItems(["Local Folder", "Zip Archive", "S3 Storage"])
+        self.backup_target_combo.setToolTip(
+            "S3 Storage uses the \"s3\" section of backup_settings.json; "
+            "credentials come from the AWS environment, ~/.aws/credentials or \"profile\""
+        )
         self.backup_button = QPushButton("Create Backup")
+        self.watch_button = QPushButton("Watch Mode")
+        self.watch_button.setCheckable(True)
         self.prepare_qwen_button = QPushButton("Prepare for Qwen")
         self.save_filter_button = QPushButton("Save Filter State")
         self.canvas_qwen_button = QPushButton("One Canvas for Qwen")
@@ -72,7 +402,9 @@ class ProjectBackupApp(QMainWindow):
         self.select_all_button = QPushButton("Select All Files")
         self.clear_selection_button = QPushButton("Clear Selection")
 
+        action_layout.addWidget(self.backup_target_combo)
         action_layout.addWidget(self.backup_button)
+        action_layout.addWidget(self.watch_button)
         action_layout.addWidget(self.prepare_qwen_button)
         action_layout.addWidget(self.save_filter_button)
         action_layout.addWidget(self.canvas_qwen_button)
@@ -98,6 +430,11 @@ class ProjectBackupApp(QMainWindow):
         self.selected_files = []
         self.excluded_items = set()
         self.settings_file = "backup_settings.json"
+        self.project_watcher = None
+        self.tray_icon = None
+        self.s3_settings = {}
+        self.backup_worker = None
+        self.watcher_paused = False
 
         # Auto-detect project directory after widgets are created
         self.detect_project_directory()
@@ -107,6 +444,8 @@ class ProjectBackupApp(QMainWindow):
         self.refresh_button.clicked.connect(self.refresh_projects)
         self.project_combo.currentTextChanged.connect(self.load_project_structure)
         self.backup_button.clicked.connect(self.create_backup)
+        self.watch_button.toggled.connect(self.toggle_watch_mode)
+        self.backup_target_combo.currentTextChanged.connect(self.update_watch_button)
         self.prepare_qwen_button.clicked.connect(self.prepare_for_qwen)
         self.canvas_qwen_button.clicked.connect(self.export_one_canvas_for_qwen)
         self.select_all_button.clicked.connect(self.select_all_files)
@@ -115,6 +454,7 @@ class ProjectBackupApp(QMainWindow):
         # Load settings and refresh projects
         self.load_settings()
         self.refresh_projects()
+        self.update_watch_button()
 
     def detect_project_directory(self):
         """Автоматически определяет директорию проектов (на уровень выше текущего проекта)"""
@@ -151,6 +491,13 @@ class ProjectBackupApp(QMainWindow):
             with open(self.settings_file, 'r', encoding='utf-8') as f:
                 settings = json.load(f)
                 recent_dirs = settings.get("recent_dirs", [])
+                # Ключи доступа в этом файле не храним: он попадает в бэкапы и может попасть в git.
+                # Оставшиеся от старых версий ключи отбрасываются и при сохранении исчезнут из файла
+                self.s3_settings = {key: value for key, value in settings.get("s3", {}).items()
+                                    if key not in S3_SECRET_SETTINGS}
+                target_index = self.backup_target_combo.findText(settings.get("backup_target", ""))
+                if target_index >= 0:
+                    self.backup_target_combo.setCurrentIndex(target_index)
 
                 # Добавляем недавние директории в комбобокс, если их нет
                 for dir_path in recent_dirs:
@@ -197,8 +544,11 @@ class ProjectBackupApp(QMainWindow):
 
         settings = {
             "recent_dirs": recent_dirs,
-            "last_used_dir": self.projects_dir
+            "last_used_dir": self.projects_dir,
+            "backup_target": self.backup_target_combo.currentText()
         }
+        if self.s3_settings:
+            settings["s3"] = self.s3_settings
 
         with open(self.settings_file, 'w', encoding='utf-8') as f:
             json.dump(settings, f, ensure_ascii=False, indent=2)
@@ -332,7 +682,8 @@ class ProjectBackupApp(QMainWindow):
             except PermissionError:
                 pass  # Skip entries we don't have permission to access
 
-    def should_include(self, entry):
+    @staticmethod
+    def should_include(entry):
         """Determine if a file/directory should be included in the tree"""
         name = entry.name.lower()
 
@@ -422,6 +773,35 @@ class ProjectBackupApp(QMainWindow):
             QMessageBox.warning(self, "Warning", "Project directory does not exist.")
             return
 
+        if self.is_backup_running():
+            QMessageBox.warning(self, "Warning", "A backup is already running.")
+            return
+
+        target = self.backup_target_combo.currentText()
+        if target == "S3 Storage":
+            backend = self.create_s3_backend()
+        elif target == "Zip Archive":
+            backend = self.create_archive_backend(project_name)
+        else:
+            backend = self.create_local_backend(project_name)
+        if backend is None:
+            return
+
+        # Локальный бэкап пересоздаёт каталог, в который пишет режим наблюдения
+        if (isinstance(backend, LocalDirBackend) and self.project_watcher and
+                os.path.abspath(backend.backup_dir) == self.project_watcher.backup_dir):
+            self.project_watcher.stop()
+            self.watcher_paused = True
+
+        self.backup_button.setEnabled(False)
+        self.statusBar().showMessage(f"Backing up {project_name} to {backend.describe()}...")
+        self.backup_worker = BackupWorker(backend, project_path, self)
+        self.backup_worker.progress.connect(self.on_backup_progress)
+        self.backup_worker.succeeded.connect(self.on_backup_succeeded)
+        self.backup_worker.failed.connect(self.on_backup_failed)
+        self.backup_worker.start()
+
+    def create_local_backend(self, project_name):
         # Create backup directory
         backup_dir = os.path.join(self.projects_dir, f"{project_name}_backup")
         if os.path.exists(backup_dir):
@@ -433,24 +813,162 @@ class ProjectBackupApp(QMainWindow):
             if reply == QMessageBox.No:
                 backup_dir = QFileDialog.getExistingDirectory(self, "Select Backup Location")
                 if not backup_dir:
-                    return
+                    return None
+        return LocalDirBackend(backup_dir)
+
+    def create_archive_backend(self, project_name):
+        default_path = os.path.join(self.projects_dir, f"{project_name}_backup.zip")
+        archive_path, _ = QFileDialog.getSaveFileName(
+            self, "Save Backup Archive", default_path, "Zip archives (*.zip)")
+        return ArchiveBackend(archive_path) if archive_path else None
+
+    def create_s3_backend(self):
+        if not self.s3_settings.get("bucket"):
+            QMessageBox.warning(
+                self, "Warning",
+                f"S3 storage is not configured.\nAdd an \"s3\" section with at least "
+                f"\"bucket\" to {os.path.abspath(self.settings_file)}.\n\n"
+                f"Credentials are taken from the AWS environment variables or "
+                f"~/.aws/credentials (optionally a named \"profile\"), not from this file."
+            )
+            return None
+        try:
+            return S3Backend.from_settings(self.s3_settings)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to connect to S3 storage:\n{str(e)}")
+            return None
+
+    def on_backup_progress(self, done, total):
+        if total:
+            self.statusBar().showMessage(f"Backup: {done * 100 // total}%")
+
+    def on_backup_succeeded(self, location):
+        self.finish_backup()
+        QMessageBox.information(self, "Success", f"Backup created at:\n{location}")
+
+    def on_backup_failed(self, message):
+        self.finish_backup()
+        QMessageBox.critical(self, "Error", f"Failed to create backup:\n{message}")
+
+    def finish_backup(self):
+        self.backup_button.setEnabled(True)
+        self.statusBar().clearMessage()
+        if self.watcher_paused:
+            self.watcher_paused = False
+            if self.project_watcher:
+                # Бэкап пересоздан целиком - его файлы watcher не трогает
+                self.project_watcher.managed.clear()
+                try:
+                    self.project_watcher.start()
+                except Exception as e:
+                    QMessageBox.critical(self, "Error", f"Failed to resume watch mode:\n{str(e)}")
+                    self.stop_watch_mode()
+
+    def is_backup_running(self):
+        return self.backup_worker is not None and self.backup_worker.isRunning()
+
+    def update_watch_button(self):
+        """Watch mode only mirrors into the local backup folder"""
+        if self.project_watcher:
+            self.watch_button.setEnabled(True)
+            return
+        local = self.backup_target_combo.currentText() == "Local Folder"
+        self.watch_button.setEnabled(local)
+        if local:
+            self.watch_button.setToolTip("Keep the local backup folder in sync with the project in the background")
+        else:
+            self.watch_button.setToolTip("Watch mode is only available for the \"Local Folder\" target")
+
+    def toggle_watch_mode(self, checked):
+        """Start or stop continuous backup of the selected project"""
+        if not checked:
+            self.stop_watch_mode()
+            return
+
+        if self.is_backup_running():
+            QMessageBox.warning(self, "Warning", "Please wait for the running backup to finish.")
+            self.watch_button.setChecked(False)
+            return
+
+        project_name = self.project_combo.currentText()
+        project_path = os.path.join(self.projects_dir, project_name)
+        if not project_name or not os.path.isdir(project_path):
+            QMessageBox.warning(self, "Warning", "Please select a project first.")
+            self.watch_button.setChecked(False)
+            return
 
-        # Perform backup (excluding unnecessary directories)
+        backup_dir = os.path.join(self.projects_dir, f"{project_name}_backup")
+        self.project_watcher = ProjectWatcher(project_path, backup_dir, parent=self)
+        self.project_watcher.synced.connect(self.on_watch_synced)
         try:
-            if os.path.exists(backup_dir):
-                shutil.rmtree(backup_dir)
-
-            shutil.copytree(
-                project_path,
-                backup_dir,
-                ignore=shutil.ignore_patterns(
-                    '.idea', '__pycache__', '.git', '.venv', 'venv', 'env', 'node_modules',
-                    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp', '*.svg', '*.ico', '*.webp'
-                )
-            )
-            QMessageBox.information(self, "Success", f"Backup created at:\n{backup_dir}")
+            self.project_watcher.start()
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to create backup:\n{str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to start watch mode:\n{str(e)}")
+            self.watch_button.setChecked(False)
+            return
+
+        self.watch_button.setText(f"Watching: {project_name} (Local Folder)")
+        self.show_tray_icon(f"Watching {project_name} -> {backup_dir}")
+
+    def stop_watch_mode(self):
+        if self.project_watcher:
+            self.project_watcher.stop()
+            self.project_watcher.deleteLater()
+            self.project_watcher = None
+        self.watch_button.setText("Watch Mode")
+        if self.watch_button.isChecked():
+            self.watch_button.setChecked(False)
+        if self.tray_icon:
+            self.tray_icon.hide()
+        self.update_watch_button()
+
+    def on_watch_synced(self, project_path, count):
+        message = f"{os.path.basename(project_path)}: {count} change(s) backed up"
+        self.statusBar().showMessage(message, 5000)
+        if self.tray_icon:
+            self.tray_icon.setToolTip(message)
+
+    def show_tray_icon(self, tooltip):
+        """Показывает иконку в трее, чтобы наблюдение продолжалось при закрытом окне"""
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            return
+        if self.tray_icon is None:
+            self.tray_icon = QSystemTrayIcon(self.style().standardIcon(QStyle.SP_DriveHDIcon), self)
+            menu = QMenu(self)
+            menu.addAction("Show Window", self.showNormal)
+            menu.addAction("Stop Watching", self.stop_watch_mode)
+            menu.addAction("Quit", self.quit_application)
+            self.tray_icon.setContextMenu(menu)
+            self.tray_icon.activated.connect(lambda reason: self.showNormal())
+        self.tray_icon.setToolTip(tooltip)
+        self.tray_icon.show()
+
+    def warn_backup_running(self):
+        QMessageBox.warning(
+            self, "Warning",
+            "A backup is still running.\nPlease wait for it to finish before quitting."
+        )
+
+    def quit_application(self):
+        if self.is_backup_running():
+            self.showNormal()
+            self.warn_backup_running()
+            return
+        QApplication.quit()
+
+    def closeEvent(self, event):
+        # В режиме наблюдения окно сворачивается в трей
+        if self.project_watcher and self.tray_icon and self.tray_icon.isVisible():
+            self.hide()
+            self.tray_icon.showMessage("Watch Mode", "Backup continues in the background.")
+            event.ignore()
+            return
+        # Уничтожение работающего QThread аварийно завершает процесс
+        if self.is_backup_running():
+            self.warn_backup_running()
+            event.ignore()
+            return
+        super().closeEvent(event)
 
     def prepare_for_qwen(self):
         """Prepare selected files for Qwen (copy to forQwen folder, change extension to .txt)"""
@@ -670,16 +1188,15 @@ class ProjectBackupApp(QMainWindow):
             rel = os.path.relpath(file_path, project_root)
 
             try:
-                with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                    code = f.read()
+                language, code = read_file_for_canvas(file_path)
             except Exception as e:
-                code = f"# ERROR READING FILE: {e}"
+                language, code = "text", f"# ERROR READING FILE: {e}"
 
             canvas.append(
                 "\n" + "=" * 50 +
                 f"\n# FILE: {rel}\n" +
                 "=" * 50 + "\n"
-                           "```python\n" +
+                           f"```{language}\n" +
                 code +
                 "\n```\n"
             )
@@ -695,7 +1212,51 @@ class ProjectBackupApp(QMainWindow):
         )
 
 
+def run_headless_watch(argv):
+    """Run watch mode without a window: main.py --watch [--projects-dir DIR] [PROJECT ...]"""
+    parser = argparse.ArgumentParser(
+        description="Continuously back up PyCharm projects into <project>_backup folders")
+    parser.add_argument("--watch", action="store_true")
+    parser.add_argument("--projects-dir", default=os.getcwd())
+    parser.add_argument("--debounce-ms", type=int, default=WATCH_DEBOUNCE_MS)
+    parser.add_argument("projects", nargs="*", help="project names (default: all PyCharm projects)")
+    args = parser.parse_args(argv)
+
+    projects_dir = os.path.abspath(args.projects_dir)
+    projects = args.projects or sorted(
+        item for item in os.listdir(projects_dir)
+        if os.path.isdir(os.path.join(projects_dir, item, ".idea"))
+    )
+    if not projects:
+        print(f"No projects to watch in {projects_dir}", file=sys.stderr)
+        return 1
+
+    app = QCoreApplication(sys.argv[:1])
+    signal.signal(signal.SIGINT, signal.SIG_DFL)  # Ctrl+C прерывает цикл событий Qt
+
+    watchers = []
+    for project_name in projects:
+        project_path = os.path.join(projects_dir, project_name)
+        if not os.path.isdir(project_path):
+            print(f"Skipping {project_name}: not a directory", file=sys.stderr)
+            continue
+        backup_dir = os.path.join(projects_dir, f"{project_name}_backup")
+        watcher = ProjectWatcher(project_path, backup_dir, args.debounce_ms)
+        watcher.synced.connect(
+            lambda path, count: print(f"{os.path.basename(path)}: {count} change(s) backed up", flush=True))
+        watcher.start()
+        watchers.append(watcher)
+        print(f"Watching {project_path} -> {backup_dir}", flush=True)
+
+    if not watchers:
+        return 1
+    return app.exec_()
+
+
 def main():
+    if "--watch" in sys.argv[1:]:
+        sys.exit(run_headless_watch(sys.argv[1:]))
+
     app = QApplication(sys.argv)
     window = ProjectBackupApp()
     window.show()
@@ -0,0 +1,151 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+from backup_backends import S3Backend, S3_MIN_CHUNK_SIZE  # noqa: E402
+
+CHUNK = S3_MIN_CHUNK_SIZE
+BUCKET = "backups"
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        backend = S3Backend(BUCKET, "offsite", region="us-east-1", chunk_size=CHUNK, max_workers=4)
+        backend.client.create_bucket(Bucket=BUCKET)
+        yield backend
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "proj"
+    (root / "pkg").mkdir(parents=True)
+    (root / ".git").mkdir()
+    (root / "pkg" / "small.py").write_text("print('hi')\n")
+    (root / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    (root / "big.bin").write_bytes(os.urandom(2 * CHUNK + 1234))
+    return root
+
+
+def record_calls(backend):
+    """Wrap the upload methods of the client and return the list of calls"""
+    calls = []
+    for name in ("put_object", "upload_part"):
+        original = getattr(backend.client, name)
+
+        def wrapper(_original=original, _name=name, **kwargs):
+            calls.append((_name, kwargs["Key"], kwargs.get("PartNumber")))
+            return _original(**kwargs)
+
+        setattr(backend.client, name, wrapper)
+    return calls
+
+
+def stored(backend, key):
+    return backend.client.get_object(Bucket=BUCKET, Key=key)["Body"].read()
+
+
+def test_uploads_project_and_skips_unchanged_files(backend, project):
+    calls = record_calls(backend)
+    backend.backup(str(project))
+
+    assert sorted(backend.list_remote("offsite/")) == ["offsite/proj/big.bin", "offsite/proj/pkg/small.py"]
+    assert stored(backend, "offsite/proj/big.bin") == (project / "big.bin").read_bytes()
+    assert sorted(n for op, _, n in calls if op == "upload_part") == [1, 2, 3]
+
+    calls.clear()
+    backend.backup(str(project))
+    assert calls == []
+
+
+def test_resumes_interrupted_multipart_upload(backend, project):
+    backend.backup(str(project))
+    data = bytearray((project / "big.bin").read_bytes())
+    data[:100] = b"x" * 100
+    data[-100:] = b"y" * 100
+    (project / "big.bin").write_bytes(bytes(data))
+
+    calls = record_calls(backend)
+    upload_part = backend.client.upload_part
+
+    def flaky_upload_part(**kwargs):
+        if kwargs["PartNumber"] == 3:
+            raise IOError("connection reset")
+        return upload_part(**kwargs)
+
+    backend.client.upload_part = flaky_upload_part
+    with pytest.raises(RuntimeError):
+        backend.backup(str(project))
+
+    backend.client.upload_part = upload_part
+    calls.clear()
+    backend.backup(str(project))
+
+    assert calls == [("upload_part", "offsite/proj/big.bin", 3)]
+    assert stored(backend, "offsite/proj/big.bin") == bytes(data)
+
+
+def test_aborts_stale_multipart_uploads(backend, project):
+    client = backend.client
+    # Два незавершённых для большого файла, по одному для маленького и удалённого
+    for key in ("offsite/proj/big.bin", "offsite/proj/big.bin",
+                "offsite/proj/pkg/small.py", "offsite/proj/deleted.bin"):
+        client.create_multipart_upload(Bucket=BUCKET, Key=key)
+
+    backend.backup(str(project))
+
+    assert client.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == []
+    assert stored(backend, "offsite/proj/big.bin") == (project / "big.bin").read_bytes()
+
+
+def test_chunk_size_is_clamped_to_s3_minimum(backend):
+    settings = {"bucket": BUCKET, "region": "us-east-1", "chunk_size_mb": 1}
+    assert S3Backend.from_settings(settings).chunk_size == S3_MIN_CHUNK_SIZE
+
+
+def test_deleted_files_are_removed_from_storage(backend, project):
+    (project / "old.txt").write_text("old\n")
+    backend.backup(str(project))
+    assert "offsite/proj/old.txt" in backend.list_remote("offsite/")
+
+    (project / "old.txt").unlink()
+    backend.backup(str(project))
+
+    assert sorted(backend.list_remote("offsite/")) == ["offsite/proj/big.bin", "offsite/proj/pkg/small.py"]
+
+
+def test_deleted_files_are_kept_when_delete_removed_is_off(backend, project):
+    (project / "old.txt").write_text("old\n")
+    backend.backup(str(project))
+    (project / "old.txt").unlink()
+
+    backend.delete_removed = False
+    backend.backup(str(project))
+
+    assert "offsite/proj/old.txt" in backend.list_remote("offsite/")
+
+
+def test_other_projects_are_not_deleted(backend, project, tmp_path):
+    other = tmp_path / "proj2"
+    other.mkdir()
+    (other / "keep.py").write_text("keep\n")
+    backend.backup(str(other))
+
+    backend.backup(str(project))
+
+    assert "offsite/proj2/keep.py" in backend.list_remote("offsite/")
+
+
+def test_credentials_are_not_read_from_settings(backend):
+    settings = {"bucket": BUCKET, "region": "us-east-1",
+                "access_key": "FROM-SETTINGS", "secret_key": "FROM-SETTINGS"}
+    credentials = S3Backend.from_settings(settings).client._request_signer._credentials
+    assert credentials.access_key != "FROM-SETTINGS"
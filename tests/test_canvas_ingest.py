@@ -0,0 +1,91 @@
+import os
+import sys
+import codecs
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from canvas_ingest import (  # noqa: E402
+    CANVAS_EXCERPT_BYTES, CANVAS_MAX_FILE_BYTES, detect_encoding, read_file_for_canvas,
+)
+
+LINE = "привет, world\n"
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_binary_file_is_skipped(tmp_path):
+    path = write(tmp_path, "image.py", b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR" * 10)
+    assert read_file_for_canvas(path) == ("text", "# BINARY FILE SKIPPED (160 bytes)")
+
+
+def test_large_binary_file_is_skipped(tmp_path):
+    path = write(tmp_path, "dump.bin", os.urandom(CANVAS_MAX_FILE_BYTES + 1))
+    language, text = read_file_for_canvas(path)
+    assert text.startswith("# BINARY FILE SKIPPED")
+
+
+def test_cp1251_fallback(tmp_path):
+    path = write(tmp_path, "notes.txt", "Привет, мир\n".encode("cp1251"))
+    assert detect_encoding("Привет".encode("cp1251")) == "cp1251"
+    assert read_file_for_canvas(path) == ("text", "Привет, мир\n")
+
+
+def test_fence_language_from_extension(tmp_path):
+    assert read_file_for_canvas(write(tmp_path, "app.js", b"let x = 1;\n")) == ("javascript", "let x = 1;\n")
+    assert read_file_for_canvas(write(tmp_path, "Makefile", b"all:\n"))[0] == "text"
+
+
+def test_large_file_is_cut_to_head_and_tail(tmp_path):
+    lines = [f"line {i}\n" for i in range(60000)]
+    data = "".join(lines).encode()
+    path = write(tmp_path, "bundle.js", data)
+
+    language, text = read_file_for_canvas(path)
+    head, marker, tail = text.partition("\n\n... [TRUNCATED: ")
+
+    assert language == "javascript"
+    assert marker
+    assert f"of {len(data)} bytes omitted]" in tail
+    assert head.startswith("line 0\nline 1\n")
+    assert tail.endswith("line 59999\n")
+    # Обрезка идёт по границам строк
+    assert head.splitlines()[-1] in {l.rstrip("\n") for l in lines}
+    assert tail.split("...\n\n", 1)[1].splitlines()[0] in {l.rstrip("\n") for l in lines}
+    assert len(text) < 2 * CANVAS_EXCERPT_BYTES + 200
+
+
+@pytest.mark.parametrize("encoding, bom", [
+    ("utf-16-le", codecs.BOM_UTF16_LE),
+    ("utf-16-be", codecs.BOM_UTF16_BE),
+    ("utf-16-le", b""),
+    ("utf-16-be", b""),
+])
+def test_utf16_small_file(tmp_path, encoding, bom):
+    path = write(tmp_path, "notes.txt", bom + (LINE * 3).encode(encoding))
+    assert read_file_for_canvas(path) == ("text", LINE * 3)
+
+
+@pytest.mark.parametrize("encoding, bom", [
+    ("utf-16-le", codecs.BOM_UTF16_LE),
+    ("utf-16-be", codecs.BOM_UTF16_BE),
+    ("utf-16-le", b""),
+    ("utf-16-be", b""),
+])
+def test_utf16_large_file_excerpts(tmp_path, encoding, bom):
+    path = write(tmp_path, "notes.txt", bom + (LINE * 30000).encode(encoding))
+
+    language, text = read_file_for_canvas(path)
+    head, _, tail = text.partition("\n\n... [TRUNCATED: ")
+    tail = tail.split("...\n\n", 1)[1]
+
+    assert head.startswith(LINE + LINE)
+    assert tail.endswith(LINE + LINE)
+    assert "﻿" not in text
+    # Хвост декодирован в правильном порядке байт
+    assert set(tail) <= set(LINE)
@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+import main  # noqa: E402
+from backup_backends import LocalDirBackend  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "proj"
+    (root / "pkg").mkdir(parents=True)
+    (root / "node_modules").mkdir()
+    (root / "main.py").write_text("print('main')\n")
+    (root / "pkg" / "util.py").write_text("X = 1\n")
+    (root / "notes.txt").write_text("notes\n")
+    (root / "node_modules" / "lib.js").write_text("lib\n")
+    return root
+
+
+@pytest.fixture
+def watcher(qapp, project, tmp_path):
+    watcher = main.ProjectWatcher(str(project), str(tmp_path / "proj_backup"))
+    yield watcher
+    watcher.stop()
+
+
+def backup_files(watcher):
+    root = watcher.backup_dir
+    return sorted(os.path.relpath(os.path.join(d, f), root).replace(os.sep, "/")
+                  for d, _, files in os.walk(root) for f in files)
+
+
+def test_is_included_applies_tree_rules_and_exclusions(watcher, project):
+    watcher.excluded_items = {"notes.txt"}
+    entries = {e.name: e for e in os.scandir(project)}
+    assert watcher.is_included(entries["main.py"])
+    assert watcher.is_included(entries["pkg"])
+    assert not watcher.is_included(entries["node_modules"])
+    assert not watcher.is_included(entries["notes.txt"])
+
+
+def test_start_keeps_files_copied_by_create_backup(watcher, project):
+    for name in ("pyproject.toml", "setup.cfg", "Dockerfile", "data.csv"):
+        (project / name).write_text(name)
+    (project / "gone.toml").write_text("old")
+    LocalDirBackend(watcher.backup_dir).backup(str(project))
+    (project / "gone.toml").unlink()
+
+    watcher.start()
+
+    files = backup_files(watcher)
+    for name in ("pyproject.toml", "setup.cfg", "Dockerfile", "data.csv"):
+        assert name in files
+    # Удалённые из проекта файлы удаляются из бэкапа в любом случае
+    assert "gone.toml" not in files
+
+
+def test_excluded_entries_are_removed_from_backup(watcher, project):
+    watcher.start()
+    assert "notes.txt" in backup_files(watcher)
+
+    # Файл исключений создаётся впервые: приходит только событие каталога
+    (project / "excluded_items.json").write_text(json.dumps(["notes.txt", "pkg"]))
+    watcher.on_directory_changed(str(project))
+    assert watcher.reload_exclusions
+    watcher.flush()
+
+    assert backup_files(watcher) == ["excluded_items.json", "main.py"]
+
+
+def test_failing_entry_does_not_stop_directory_sync(watcher, project, monkeypatch, capsys):
+    copy2 = main.shutil.copy2
+
+    def locked_copy(src, dst):
+        if src.endswith("notes.txt"):
+            raise PermissionError("file is locked")
+        return copy2(src, dst)
+
+    monkeypatch.setattr(main.shutil, "copy2", locked_copy)
+    watcher.start()
+
+    assert backup_files(watcher) == ["main.py", "pkg/util.py"]
+    assert watcher.retry_attempts == {str(project): 1}
+    assert watcher.retry_timer.isActive()
+    assert capsys.readouterr().err.count("file is locked") == 1
+
+    monkeypatch.setattr(main.shutil, "copy2", copy2)
+    watcher.retry_now()
+    assert "notes.txt" in backup_files(watcher)
+    assert watcher.retry_attempts == {}
+
+
+def test_persistent_error_backs_off_and_gives_up(watcher, project, monkeypatch, capsys):
+    def locked_copy(src, dst):
+        raise PermissionError("file is locked")
+
+    monkeypatch.setattr(main.shutil, "copy2", locked_copy)
+    watcher.start()
+    intervals = [watcher.retry_timer.interval()]
+    for _ in range(main.WATCH_MAX_RETRIES):
+        watcher.retry_timer.stop()
+        watcher.retry_now()
+        if watcher.retry_timer.isActive():
+            intervals.append(watcher.retry_timer.interval())
+
+    base = watcher.debounce_ms
+    assert intervals == [base * 2 ** i for i in range(main.WATCH_MAX_RETRIES)]
+    assert not watcher.retry_timer.isActive()
+    err = capsys.readouterr().err
+    assert err.count("file is locked") == 2  # по одному разу на proj и proj/pkg
+    assert "giving up" in err
+
+    # Новое событие в каталоге снова разрешает повторы
+    watcher.on_file_changed(str(project / "main.py"))
+    assert str(project) not in watcher.retry_attempts
+
+
+def test_debounce_is_capped_by_max_wait(watcher, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(main.time, "monotonic", lambda: now[0])
+    max_wait_ms = watcher.debounce_ms * main.WATCH_MAX_WAIT_FACTOR
+
+    watcher.on_directory_changed(watcher.project_path)
+    assert watcher.debounce_timer.interval() == watcher.debounce_ms
+
+    now[0] += (max_wait_ms - 500) / 1000
+    watcher.on_directory_changed(watcher.project_path)
+    assert watcher.debounce_timer.interval() == 500
+
+    now[0] += 1
+    watcher.on_directory_changed(watcher.project_path)
+    assert watcher.debounce_timer.interval() == 0
+
+    watcher.flush()
+    watcher.on_directory_changed(watcher.project_path)
+    assert watcher.debounce_timer.interval() == watcher.debounce_ms
+
+
+def test_unwatchable_paths_are_not_recorded(watcher, monkeypatch, capsys):
+    monkeypatch.setattr(watcher.watcher, "addPath", lambda path: False)
+    watcher.start()
+
+    assert watcher.watched == set()
+    assert capsys.readouterr().err.count("cannot watch") == 1